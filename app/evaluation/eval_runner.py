@@ -12,7 +12,7 @@ The runner performs two types of evaluation:
 Reports are saved in markdown format for easy viewing and sharing.
 """
 
-from app.evaluation.retrieval_eval import run_retrieval_eval
+from app.evaluation.retrieval_eval import run_retrieval_eval, run_hierarchical_eval
 from pathlib import Path
 
 from app.evaluation.answer_eval_ragas import run_ragas
@@ -29,8 +29,9 @@ def run_all_evaluations():
     4. Generates markdown reports for both evaluations
     5. Saves reports to app/evaluation/reports/ directory
 
-    The function creates two report files:
+    The function creates three report files:
     - retrieval_report.md: Contains Recall@5 scores for each test question
+    - hierarchical_report.md: Latency and recall of flat vs. coarse-to-fine search
     - ragas_report.md: Contains comprehensive RAGAS metrics in table format
 
     Example Usage:
@@ -56,6 +57,25 @@ def run_all_evaluations():
         for q, score in retrieval_results:
             f.write(f"### Q: {q}\nRecall@5: {score}\n\n")
 
+    # Compare flat search with coarse-to-fine retrieval over page summaries
+    print("Running Hierarchical Retrieval Evaluation...")
+    hierarchical_results = run_hierarchical_eval()
+
+    with open("app/evaluation/reports/hierarchical_report.md", "w") as f:
+        f.write("# Hierarchical Retrieval Report\n\n")
+        f.write(
+            "Flat top-5 search vs. coarse-to-fine search restricted to the top candidate pages.\n"
+        )
+        f.write(
+            "Overlap@5 is the share of flat-search chunks that two-stage search also returns.\n\n"
+        )
+        f.write("| Mode | Latency (ms) | Recall@5 | Overlap@5 |\n")
+        f.write("|------|--------------|----------|-----------|\n")
+        for row in hierarchical_results:
+            f.write(
+                f"| {row['mode']} | {row['latency_ms']} | {row['recall']} | {row['overlap']} |\n"
+            )
+
     # Phase 2: Evaluate end-to-end pipeline quality using RAGAS (if available)
     print("Running RAGAS Evaluation...")
     try:
@@ -1,8 +1,10 @@
 from app.services.embedder import Embedder
 from app.services.chroma_store import ChromaStore
+from app.services.hierarchy import coarse_to_fine_query
 from sentence_transformers import util
 import numpy as np
 import json
+import time
 
 
 def semantic_recall(chunks, expected_text, embedder, threshold=0.45):
@@ -33,7 +35,7 @@ def semantic_recall(chunks, expected_text, embedder, threshold=0.45):
 
 def run_retrieval_eval():
     embedder = Embedder("multi-qa-MiniLM-L6-cos-v1")
-    store = ChromaStore()
+    store = ChromaStore(use_cache=False)
 
     with open("app/evaluation/eval_questions.json") as f:
         eval_data = json.load(f)
@@ -57,3 +59,57 @@ def run_retrieval_eval():
         results.append((q, score))
 
     return results
+
+
+def run_hierarchical_eval(coarse_ks=(3, 5, 10), level="page", k=5):
+    """
+    Compare flat top-k search with coarse-to-fine retrieval on the eval set.
+
+    For flat search and each `coarse_k`, reports mean query latency, mean
+    semantic Recall@k against the expected answers, and overlap@k: the share
+    of flat-search chunk ids that two-stage retrieval also returns.
+
+    Returns:
+        List[dict]: One row per mode with keys mode, latency_ms, recall, overlap
+    """
+    embedder = Embedder("multi-qa-MiniLM-L6-cos-v1")
+    # Uncached, so every mode's latency is a real Chroma round trip
+    store = ChromaStore(use_cache=False)
+
+    with open("app/evaluation/eval_questions.json") as f:
+        eval_data = json.load(f)
+
+    # Embed once so latencies only cover retrieval
+    queries = []
+    for item in eval_data:
+        q_vec = embedder.embed([item["question"]])[0]
+        queries.append((q_vec / np.linalg.norm(q_vec), item["expected"]))
+
+    modes = [("flat", None)] + [(f"{level} coarse_k={c}", c) for c in coarse_ks]
+    flat_ids = []
+    rows = []
+
+    for name, coarse_k in modes:
+        latencies, recalls, overlaps = [], [], []
+        for i, (q_vec, expected) in enumerate(queries):
+            start = time.perf_counter()
+            if coarse_k is None:
+                retrieved = store.query(embedding=q_vec, k=k)
+            else:
+                retrieved = coarse_to_fine_query(store, q_vec, k=k, coarse_k=coarse_k, level=level)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+            ids = retrieved["ids"][0]
+            if coarse_k is None:
+                flat_ids.append(set(ids))
+            overlaps.append(len(flat_ids[i] & set(ids)) / max(len(flat_ids[i]), 1))
+            recalls.append(semantic_recall(retrieved["documents"][0], expected, embedder))
+
+        rows.append({
+            "mode": name,
+            "latency_ms": round(float(np.mean(latencies)), 2),
+            "recall": round(float(np.mean(recalls)), 3),
+            "overlap": round(float(np.mean(overlaps)), 3),
+        })
+
+    return rows
@@ -0,0 +1,42 @@
+"""
+Gunicorn settings for the multi-worker serving mode.
+
+    gunicorn app.main:app -c app/gunicorn_conf.py
+
+`preload_app` imports app.main (and so loads the SentenceTransformer weights)
+once in the master before forking. Workers share those pages copy-on-write
+instead of each loading its own copy; HTTP clients for Chroma and the LLM
+are still created per worker in the app lifespan.
+"""
+
+import gc
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = True
+
+# Torch intra-op threads per worker; keeps workers x threads within the core count
+_torch_threads = int(os.getenv("TORCH_THREADS", "1"))
+
+# Fast tokenizers warn and disable themselves after fork unless this is set
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+
+def pre_fork(server, worker):
+    # Move preloaded objects out of the GC generations so collections in the
+    # workers do not write to (and un-share) their pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    import torch
+
+    torch.set_num_threads(_torch_threads)
+
+
+def post_worker_init(worker):
+    from app.services.memory import process_memory
+
+    worker.log.info("Worker %s memory: %s", worker.pid, process_memory())
@@ -1,17 +1,42 @@
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 from app.services.rag_pipeline import RAGPipeline
+from app.services.chroma_store import build_where
+from app.services.embedder import Embedder
+from app.services.memory import process_memory
+
+# Loaded at import time: under `gunicorn --preload` this happens once in the
+# master and the weights are shared copy-on-write by every forked worker.
+embedder = Embedder("multi-qa-MiniLM-L6-cos-v1")
+rag_pipeline: RAGPipeline | None = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Chroma/LLM HTTP clients are built per worker, after the fork
+    global rag_pipeline
+    rag_pipeline = RAGPipeline(embedder=embedder)
+    yield
+
 
 app = FastAPI(
     title="Local PDF RAG API",
     description="A local Retrieval-Augmented Generation pipeline with Chroma and LLM",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan,
 )
 
-rag_pipeline = RAGPipeline()
-
 class QuestionRequest(BaseModel):
     question: str
+    sources: list[str] | None = None
+    page_min: int | None = None
+    page_max: int | None = None
+    ingested_after: int | None = None
+    ingested_before: int | None = None
+    coarse_k: int | None = None
+    context_window: int = 0
 
 class AnswerResponse(BaseModel):
     question: str
@@ -21,10 +46,27 @@ class AnswerResponse(BaseModel):
 def root():
     return {"message": "🚀 Local PDF RAG API is running!"}
 
+@app.get("/memory")
+def worker_memory():
+    """Resident memory of the worker serving this request (RSS/PSS/USS in MiB)."""
+    return {"pid": os.getpid(), **process_memory()}
+
 @app.post("/ask", response_model=AnswerResponse)
 def ask_question(request: QuestionRequest):
     try:
-        answer = rag_pipeline.query(request.question)
+        where = build_where(
+            sources=request.sources,
+            page_min=request.page_min,
+            page_max=request.page_max,
+            ingested_after=request.ingested_after,
+            ingested_before=request.ingested_before,
+        )
+        answer = rag_pipeline.query(
+            request.question,
+            where=where,
+            coarse_k=request.coarse_k,
+            context_window=request.context_window,
+        )
         return AnswerResponse(question=request.question, answer=answer)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing question: {str(e)}")
@@ -1,12 +1,23 @@
 from app.services.pdf_reader import extract_pdf_text
 from app.services.chunker import chunk_text
-from app.services.embedder import Embedder
+from app.services.embedder import Embedder, EmbeddingPool
 from app.services.chroma_store import ChromaStore
+from app.services.hierarchy import SummaryBuilder
+from app.services.page_store import page_id
+from app.services.checksum import file_sha256
 from rich import print  # optional, for colored output
 from rich.console import Console
 import numpy as np
+import os
+import time
 
-def process_pdf(pdf_path: str = "app/files/attention.pdf"):
+
+def process_pdf(
+    pdf_path: str = "app/files/attention.pdf",
+    processes: int | None = None,
+    threads_per_process: int = 1,
+    compact: bool = True,
+):
     # Extract text from PDF
     pages = extract_pdf_text(pdf_path)
 
@@ -16,16 +27,52 @@ def process_pdf(pdf_path: str = "app/files/attention.pdf"):
     # Prepare texts for embedding
     texts = [chunk.text for chunk in chunks]
     ids = [chunk.id for chunk in chunks]
-    metas = [{"page": chunk.page, "source": "transformer_paper"} for chunk in chunks]
+    source = os.path.basename(pdf_path)
+    doc_hash = file_sha256(pdf_path)
+    ingested_at = int(time.time())
+    page_ids = {page.page: page_id(doc_hash, page.page) for page in pages}
+    metas = [
+        {
+            "source": source,
+            "page": chunk.page,
+            "doc_hash": doc_hash,
+            "ingested_at": ingested_at,
+        }
+        for chunk in chunks
+    ]
+    if compact:
+        # Offsets are only valid once the page text is in the page store (below)
+        for meta, chunk in zip(metas, chunks):
+            meta.update(page_id=page_ids[chunk.page], start=chunk.start, end=chunk.end)
 
-    embedder = Embedder()
-    # 1. embed texts
-    vectors = embedder.embed(texts)
+    # 1. embed texts (sharded across a process pool for bulk ingests)
+    if processes and processes > 1:
+        with EmbeddingPool(processes=processes, threads_per_process=threads_per_process) as pool:
+            vectors = pool.embed(texts)
+    else:
+        embedder = Embedder()
+        vectors = embedder.embed(texts)
     # 2. normalize vectors (critical for cosine search!)
     vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
 
     store = ChromaStore()
-    store.add(ids=ids, texts=texts, metadatas=metas, embeddings=vectors)
+    # Replace any previous revision: chunk ids are <filename>_<n>, and Chroma
+    # silently skips ids that already exist, which would keep stale chunks.
+    # Its summaries go too, or they would point coarse search at a doc_hash
+    # that no longer has chunks
+    store.delete(where={"source": source})
+    store.delete_summaries(where={"source": source})
+    if compact:
+        # Page text is stored once locally; Chroma keeps only chunk offsets
+        store.pages.put_pages({page_ids[page.page]: page.text for page in pages})
+        store.add(ids=ids, texts=None, metadatas=metas, embeddings=vectors)
+    else:
+        store.add(ids=ids, texts=texts, metadatas=metas, embeddings=vectors)
+
+    # 3. page/document centroids for coarse-to-fine retrieval
+    summaries = SummaryBuilder()
+    summaries.add(metas, vectors)
+    store.add_summaries(*summaries.build())
     print("✅ PDF processed and stored successfully.")
 
 
@@ -35,10 +82,39 @@ def collection_count():
     print("Total documents in collection:", count)
 
 
-def query_pdf(question: str = "What is attention mechanism?", top_k: int = 5):
+def query_pdf(
+    question: str = "What is attention mechanism?",
+    top_k: int = 5,
+    where: dict | None = None,
+    coarse_k: int | None = None,
+):
     from app.services.rag_pipeline import RAGPipeline
 
     rag = RAGPipeline()
-    answer = rag.query(question=question, k=top_k)
+    answer = rag.query(question=question, k=top_k, where=where, coarse_k=coarse_k)
     print("\n💬 RAG Answer:\n", answer)
  
+
+
+def export_index(out_dir: str = "data/snapshot"):
+    from app.services.snapshot import export_snapshot
+
+    manifest = export_snapshot(ChromaStore(), out_dir)
+    print(f"✅ Exported {manifest['count']} chunks to {out_dir}")
+
+
+def import_index(snapshot_dir: str = "data/snapshot"):
+    from app.services.snapshot import import_snapshot
+
+    loaded = import_snapshot(ChromaStore(), snapshot_dir)
+    print(f"✅ Imported {loaded} chunks from {snapshot_dir}")
+
+
+def report_worker_memory(master_pid: int):
+    from app.services.memory import worker_memory_report
+
+    report = worker_memory_report(master_pid)
+    print("Master:", report["master"])
+    for pid, mem in report["workers"].items():
+        print(f"Worker {pid}:", mem)
+    print("Total PSS (MiB):", report["total_pss_mb"])
@@ -1,26 +1,198 @@
+import os
+import threading
 import chromadb
+from app.services.page_store import PageStore
+from app.services.retrieval_cache import RetrievalCache
 
 class ChromaStore:
-    def __init__(self):
+    # Index generation and result cache are shared by every store in the
+    # process: they all front the same collections, so a write through one
+    # instance must invalidate results cached by the others
+    generation = 0
+    _shared_cache: RetrievalCache | None = None
+    _lock = threading.Lock()
+
+    def __init__(self, cache: RetrievalCache | None = None, use_cache: bool = True):
+        # Retrieval results are cached per index generation, which every add/delete bumps.
+        # use_cache=False always queries Chroma, e.g. to measure retrieval latency
+        self.cache = (cache or self._default_cache()) if use_cache else None
+        # Page texts for chunks stored as (page_id, start, end) offsets
+        self.pages = PageStore(os.getenv("PAGE_STORE_DIR", "data/pages"))
         self.client = chromadb.HttpClient(host="chroma", port=8000)
         self.collection = self.client.get_or_create_collection(
             name="pdf_chunks",
             metadata={"hnsw:space": "cosine"}
         )
+        # Small index of page/document centroids for coarse-to-fine retrieval
+        self.summaries = self.client.get_or_create_collection(
+            name="pdf_summaries",
+            metadata={"hnsw:space": "cosine"}
+        )
 
     def add(
         self,
         ids: list[str],
-        texts: list[str],
+        texts: list[str] | None,
         metadatas: list[dict],
         embeddings: list[list[float]],
     ):
-        """Add embeddings and metadata to Chroma collection."""
+        """
+        Add embeddings and metadata to Chroma collection.
+
+        Pass `texts=None` for chunks whose metadata holds page offsets; their
+        text is then read from the page store at query time.
+        """
         self.collection.add(
             ids=ids, documents=texts, metadatas=metadatas, embeddings=embeddings
         )
+        self._bump_generation()
 
-    def query(self, embedding: list[float], k: int = 5):
-        """Retrieve top-k similar chunks."""
-        results = self.collection.query(query_embeddings=[embedding], n_results=k)
+    def delete(self, ids: list[str] | None = None, where: dict | None = None):
+        """Delete chunks by id or metadata filter."""
+        self.collection.delete(ids=ids, where=where or None)
+        self._bump_generation()
+
+    @staticmethod
+    def _default_cache() -> RetrievalCache | None:
+        cache_entries = int(os.getenv("RETRIEVAL_CACHE_ENTRIES", "1024"))
+        if not cache_entries:
+            return None
+        with ChromaStore._lock:
+            if ChromaStore._shared_cache is None:
+                ChromaStore._shared_cache = RetrievalCache(max_entries=cache_entries)
+            return ChromaStore._shared_cache
+
+    @staticmethod
+    def _bump_generation() -> None:
+        with ChromaStore._lock:
+            ChromaStore.generation += 1
+
+    def _cached(self, kind: str, embedding, run, **params):
+        """Return a cached result for this query at the current generation, or compute it."""
+        if self.cache is None:
+            return run()
+        key = self.cache.key(embedding, kind=kind, **params)
+        results = self.cache.get(key, self.generation)
+        if results is None:
+            generation = self.generation
+            results = run()
+            self.cache.put(key, generation, results)
         return results
+
+    def query(
+        self,
+        embedding: list[float],
+        k: int = 5,
+        where: dict | None = None,
+        context_window: int = 0,
+    ):
+        """
+        Retrieve top-k similar chunks, optionally restricted by a metadata filter.
+
+        Chunk texts are rehydrated from the page store; `context_window`
+        widens each hit by up to that many characters on both sides.
+        """
+        def run():
+            results = self.collection.query(
+                query_embeddings=[embedding], n_results=k, where=where or None
+            )
+            return self.pages.rehydrate(results, window=context_window)
+
+        return self._cached(
+            "chunks", embedding, run, k=k, where=where, context_window=context_window
+        )
+
+    def add_summaries(
+        self,
+        ids: list[str],
+        metadatas: list[dict],
+        embeddings: list[list[float]],
+    ):
+        """Insert or refresh page/document summary vectors."""
+        self.summaries.upsert(ids=ids, metadatas=metadatas, embeddings=embeddings)
+        self._bump_generation()
+
+    def delete_summaries(self, where: dict):
+        """Delete page/document summaries by metadata filter."""
+        self.summaries.delete(where=where)
+        self._bump_generation()
+
+    def query_summaries(self, embedding: list[float], k: int = 10, where: dict | None = None):
+        """Retrieve the top-k page/document summaries."""
+        return self._cached(
+            "summaries",
+            embedding,
+            lambda: self.summaries.query(
+                query_embeddings=[embedding],
+                n_results=k,
+                where=where or None,
+                include=["metadatas", "distances"],
+            ),
+            k=k,
+            where=where,
+        )
+
+    def unsummarized_filter(self) -> dict | None:
+        """
+        Return a `where` filter matching chunks of documents without summaries.
+
+        These are chunks stored before summaries were built at ingest,
+        including those with no `doc_hash` at all. Returns None when every
+        chunk is covered. The result is cached per index generation.
+        """
+        cached = getattr(self, "_unsummarized", None)
+        if cached is not None and cached[0] == self.generation:
+            return cached[1]
+
+        generation = self.generation
+        docs = self.summaries.get(where={"level": "document"}, include=["metadatas"])
+        hashes = sorted({m["doc_hash"] for m in docs["metadatas"] or []})
+        where = {"doc_hash": {"$nin": hashes}} if hashes else None
+        # Only worth an extra query if such chunks exist
+        if where is not None and not self.collection.get(where=where, limit=1, include=[])["ids"]:
+            where = None
+        self._unsummarized = (generation, where)
+        return where
+
+
+def and_where(*filters: dict | None) -> dict | None:
+    """Combine Chroma `where` filters with `$and`, skipping empty ones."""
+    clauses = [f for f in filters if f]
+    if not clauses:
+        return None
+    # Chroma rejects an `$and` with a single operand
+    if len(clauses) == 1:
+        return clauses[0]
+    return {"$and": clauses}
+
+
+def build_where(
+    sources: list[str] | None = None,
+    page_min: int | None = None,
+    page_max: int | None = None,
+    ingested_after: int | None = None,
+    ingested_before: int | None = None,
+) -> dict | None:
+    """
+    Build a Chroma `where` filter from optional retrieval constraints.
+
+    Args:
+        sources: Only match chunks from these source filenames
+        page_min / page_max: Inclusive page range
+        ingested_after / ingested_before: Inclusive ingest time range (unix seconds)
+
+    Returns:
+        dict | None: Filter for `ChromaStore.query`, or None when unconstrained
+    """
+    clauses = []
+    if sources:
+        clauses.append({"source": {"$in": list(sources)}})
+    if page_min is not None:
+        clauses.append({"page": {"$gte": page_min}})
+    if page_max is not None:
+        clauses.append({"page": {"$lte": page_max}})
+    if ingested_after is not None:
+        clauses.append({"ingested_at": {"$gte": ingested_after}})
+    if ingested_before is not None:
+        clauses.append({"ingested_at": {"$lte": ingested_before}})
+    return and_where(*clauses)
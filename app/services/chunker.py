@@ -8,11 +8,15 @@ class TextChunk:
     id: str
     page: int
     text: str
+    # Character span of the chunk within its page text
+    start: int = 0
+    end: int = 0
 
 def chunk_text(pages: List[PageTextDC], max_tokens: int = 300, overlap: int = 50) -> List[TextChunk]:
     """
     Split text into semantically meaningful chunks based on sentences.
     Ensures chunks do not break semantic boundaries and keeps fixed token limits.
+    Each chunk also records its (start, end) character span in the page text.
     """
     chunks = []
     chunk_id_counter = 1
@@ -20,28 +24,41 @@ def chunk_text(pages: List[PageTextDC], max_tokens: int = 300, overlap: int = 50
     for page_data in pages:
         sentences = nltk.sent_tokenize(page_data.text)
         current_chunk = []
+        current_spans = []  # (start, end) of each token in current_chunk
         token_count = 0
+        cursor = 0
 
         for sentence in sentences:
             sentence_tokens = sentence.split()
             if token_count + len(sentence_tokens) > max_tokens:
                 # Save current chunk
                 text = " ".join(current_chunk)
+                start, end = (current_spans[0][0], current_spans[-1][1]) if current_spans else (cursor, cursor)
                 chunks.append(
                     TextChunk(
                         id=f"{page_data.source}_{chunk_id_counter:04d}",
                         page=page_data.page,
                         text=text,
+                        start=start,
+                        end=end,
                     )
                 )
                 chunk_id_counter += 1
 
                 # Overlap
                 overlap_tokens = current_chunk[-overlap:] if overlap < len(current_chunk) else current_chunk
+                overlap_spans = current_spans[-overlap:] if overlap < len(current_spans) else current_spans
                 current_chunk = overlap_tokens.copy()
+                current_spans = overlap_spans.copy()
                 token_count = len(current_chunk)
 
-            # Add sentence
+            # Add sentence, locating each token in the page text
+            for token in sentence_tokens:
+                pos = page_data.text.find(token, cursor)
+                if pos == -1:
+                    pos = cursor
+                cursor = pos + len(token)
+                current_spans.append((pos, cursor))
             current_chunk.extend(sentence_tokens)
             token_count += len(sentence_tokens)
 
@@ -53,6 +70,8 @@ def chunk_text(pages: List[PageTextDC], max_tokens: int = 300, overlap: int = 50
                     id=f"{page_data.source}_{chunk_id_counter:04d}",
                     page=page_data.page,
                     text=text,
+                    start=current_spans[0][0],
+                    end=current_spans[-1][1],
                 )
             )
             chunk_id_counter += 1
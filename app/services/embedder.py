@@ -1,3 +1,6 @@
+import multiprocessing as mp
+import os
+import numpy as np
 from sentence_transformers import SentenceTransformer
 
 class Embedder:
@@ -6,4 +9,104 @@ class Embedder:
 
     def embed(self, texts: list[str]) -> list[list[float]]:
         """Return a list of embedding vectors."""
-        return self.model.encode(texts, show_progress_bar=True, convert_to_numpy=True)
\ No newline at end of file
+        return self.model.encode(texts, show_progress_bar=True, convert_to_numpy=True)
+
+
+# Per-process model used by EmbeddingPool workers, or the error loading it
+_worker_model: SentenceTransformer | None = None
+_worker_error: Exception | None = None
+
+
+def _init_worker(model_name: str, threads: int):
+    global _worker_model, _worker_error
+    # An initializer that raises makes multiprocessing.Pool respawn the worker
+    # forever, so keep the error and raise it from the first task instead
+    try:
+        import torch
+
+        torch.set_num_threads(threads)
+        _worker_model = SentenceTransformer(model_name)
+    except Exception as e:
+        _worker_error = e
+
+
+def _encode_batch(job: tuple[int, list[str]]) -> tuple[int, np.ndarray]:
+    if _worker_error is not None:
+        raise RuntimeError(f"Embedding worker failed to load model: {_worker_error!r}")
+    batch_no, texts = job
+    vectors = _worker_model.encode(texts, batch_size=len(texts), convert_to_numpy=True)
+    return batch_no, vectors
+
+
+def _embedding_dim(model: SentenceTransformer) -> int:
+    # Renamed in sentence-transformers 6; keep working on older releases
+    get_dim = getattr(model, "get_embedding_dimension", None) or model.get_sentence_embedding_dimension
+    return get_dim()
+
+
+def length_sorted_batches(texts: list[str], batch_size: int) -> list[list[int]]:
+    """
+    Group text indices into batches of similar length.
+
+    Sorting by length before batching keeps the padding inside each batch
+    small; the indices are used to put the results back in input order.
+    """
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+    return [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+
+
+class EmbeddingPool:
+    """
+    Bulk embedder that shards texts across worker processes.
+
+    Drop-in replacement for `Embedder.embed` during large ingests: each
+    worker loads its own model and runs with a fixed torch thread count, so
+    processes x threads_per_process should not exceed the core count.
+
+    Example Usage:
+        with EmbeddingPool(processes=16, threads_per_process=2) as pool:
+            vectors = pool.embed(texts)
+    """
+
+    def __init__(
+        self,
+        model_name: str = "multi-qa-MiniLM-L6-cos-v1",
+        processes: int | None = None,
+        threads_per_process: int = 1,
+        batch_size: int = 64,
+    ):
+        self.processes = processes or max(1, (os.cpu_count() or 1) // threads_per_process)
+        self.batch_size = batch_size
+        # Load once in the parent first: a bad model name or an offline node fails
+        # here, and the workers then load from the local cache
+        self.dim = _embedding_dim(SentenceTransformer(model_name))
+        # spawn: forking a parent that already ran torch ops can deadlock its thread pool
+        self.pool = mp.get_context("spawn").Pool(
+            self.processes,
+            initializer=_init_worker,
+            initargs=(model_name, threads_per_process),
+        )
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """Return embedding vectors in the same order as `texts`."""
+        vectors = np.empty((len(texts), self.dim), dtype=np.float32)
+        batches = length_sorted_batches(texts, self.batch_size)
+        jobs = [(n, [texts[i] for i in idx]) for n, idx in enumerate(batches)]
+
+        for batch_no, batch_vectors in self.pool.imap_unordered(_encode_batch, jobs):
+            vectors[batches[batch_no]] = batch_vectors
+        return vectors
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.pool.terminate()
+            self.pool.join()
@@ -0,0 +1,136 @@
+"""
+Coarse-to-fine retrieval over page and document summaries.
+
+At ingest, every page and every document gets a centroid vector: the
+normalized mean of its chunk vectors. At query time the small summary index
+picks the top candidate pages (or documents) first, and the chunk search
+is then restricted to those candidates inside Chroma.
+"""
+
+import numpy as np
+
+from app.services.chroma_store import ChromaStore, and_where
+from app.services.page_store import page_id
+
+LEVELS = ("page", "document")
+
+
+class SummaryBuilder:
+    """Accumulate normalized chunk vectors into page and document centroids."""
+
+    def __init__(self):
+        self._sums: dict[tuple[str, int | None], np.ndarray] = {}
+        self._metas: dict[tuple[str, int | None], dict] = {}
+
+    def add(self, metadatas: list[dict], vectors) -> None:
+        """Add a batch of chunks; chunks without a `doc_hash` are skipped."""
+        for meta, vec in zip(metadatas, vectors):
+            doc_hash = (meta or {}).get("doc_hash")
+            if doc_hash is None:
+                continue
+            base = {
+                key: meta[key]
+                for key in ("source", "doc_hash", "ingested_at")
+                if key in meta
+            }
+            self._accumulate((doc_hash, meta["page"]), vec, {**base, "level": "page", "page": meta["page"]})
+            self._accumulate((doc_hash, None), vec, {**base, "level": "document"})
+
+    def _accumulate(self, key, vec, meta: dict) -> None:
+        if key in self._sums:
+            self._sums[key] += vec
+        else:
+            self._sums[key] = np.array(vec, dtype=np.float32)
+            self._metas[key] = meta
+
+    def build(self) -> tuple[list[str], list[dict], np.ndarray]:
+        """Return ids, metadatas and normalized centroid vectors."""
+        ids, metas, vectors = [], [], []
+        for (doc_hash, page), total in self._sums.items():
+            ids.append(f"{doc_hash}_doc" if page is None else page_id(doc_hash, page))
+            metas.append(self._metas[(doc_hash, page)])
+            vectors.append(total / (np.linalg.norm(total) or 1.0))
+        return ids, metas, np.array(vectors, dtype=np.float32)
+
+
+def candidate_scope(candidates: list[dict], level: str = "page") -> dict:
+    """Build a chunk-level `where` filter matching the candidate pages or documents."""
+    if level == "document":
+        return {"doc_hash": {"$in": sorted({m["doc_hash"] for m in candidates})}}
+
+    pages_by_doc: dict[str, list[int]] = {}
+    for m in candidates:
+        pages_by_doc.setdefault(m["doc_hash"], []).append(m["page"])
+    scope = [
+        {"$and": [{"doc_hash": doc_hash}, {"page": {"$in": pages}}]}
+        for doc_hash, pages in pages_by_doc.items()
+    ]
+    return scope[0] if len(scope) == 1 else {"$or": scope}
+
+
+def coarse_to_fine_query(
+    store: ChromaStore,
+    embedding,
+    k: int = 5,
+    coarse_k: int = 10,
+    level: str = "page",
+    where: dict | None = None,
+    context_window: int = 0,
+):
+    """
+    Two-stage retrieval: top `coarse_k` summaries, then top-k chunks within them.
+
+    Args:
+        store (ChromaStore): Store holding chunks and summaries
+        embedding: Normalized query vector
+        k (int): Number of chunks to return
+        coarse_k (int): Number of candidate pages/documents from the first stage
+        level (str): "page" or "document" summaries
+        where (dict | None): Metadata filter for the chunks. It is also applied
+            to page summaries, which carry the same fields; document summaries
+            have no page, so at that level it only applies in the second stage.
+        context_window (int): Characters of page text to add around each hit
+
+    Returns:
+        Chroma query results in the same shape as `ChromaStore.query`. Falls
+        back to a flat search when no summaries match. Chunks of documents
+        that have no summaries (e.g. indexed before summaries existed) are
+        searched flat as well and merged in by distance, so they are never
+        silently excluded.
+    """
+    if level not in LEVELS:
+        raise ValueError(f"level must be one of {LEVELS}, got {level!r}")
+
+    coarse_where = and_where({"level": level}, where if level == "page" else None)
+    coarse = store.query_summaries(embedding, k=coarse_k, where=coarse_where)
+    candidates = coarse["metadatas"][0]
+    if not candidates:
+        return store.query(embedding=embedding, k=k, where=where, context_window=context_window)
+
+    scope = candidate_scope(candidates, level)
+    results = store.query(
+        embedding=embedding, k=k, where=and_where(scope, where), context_window=context_window
+    )
+
+    unsummarized = store.unsummarized_filter()
+    if unsummarized is None:
+        return results
+    extra = store.query(
+        embedding=embedding, k=k, where=and_where(unsummarized, where), context_window=context_window
+    )
+    return merge_results(results, extra, k)
+
+
+def merge_results(first: dict, second: dict, k: int) -> dict:
+    """Merge two single-query Chroma results, keeping the k nearest chunks."""
+    keys = [key for key in ("ids", "documents", "metadatas", "distances") if first.get(key) is not None]
+    rows = [
+        dict(zip(keys, values))
+        for results in (first, second)
+        for values in zip(*(results[key][0] for key in keys))
+    ]
+    rows.sort(key=lambda row: row["distances"])
+    merged = dict(first)
+    for key in keys:
+        merged[key] = [[row[key] for row in rows[:k]]]
+    return merged
@@ -0,0 +1,74 @@
+import os
+from typing import Dict, List
+
+# smaps_rollup fields we report, converted from kB to MiB
+_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def parse_smaps_rollup(text: str) -> Dict[str, float]:
+    """
+    Parse the contents of /proc/<pid>/smaps_rollup.
+
+    Returns:
+        Dict[str, float]: rss_mb, pss_mb, shared_mb and uss_mb (private memory).
+        PSS splits shared pages between the processes mapping them, so summing
+        PSS over all workers gives the real memory cost of the pool.
+    """
+    kb = {}
+    for line in text.splitlines():
+        name, _, rest = line.partition(":")
+        if name in _FIELDS:
+            kb[name] = int(rest.split()[0])
+
+    def mb(value: int) -> float:
+        return round(value / 1024, 1)
+
+    return {
+        "rss_mb": mb(kb.get("Rss", 0)),
+        "pss_mb": mb(kb.get("Pss", 0)),
+        "shared_mb": mb(kb.get("Shared_Clean", 0) + kb.get("Shared_Dirty", 0)),
+        "uss_mb": mb(kb.get("Private_Clean", 0) + kb.get("Private_Dirty", 0)),
+    }
+
+
+def process_memory(pid: int | str = "self") -> Dict[str, float]:
+    """Return resident memory stats of a process, or {} where /proc is unavailable."""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            return parse_smaps_rollup(f.read())
+    except (FileNotFoundError, PermissionError, ProcessLookupError):
+        return {}
+
+
+def child_pids(parent_pid: int) -> List[int]:
+    """List the direct children of a process by scanning /proc."""
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name may contain spaces, so split after its closing paren
+                fields = f.read().rsplit(")", 1)[1].split()
+        except (FileNotFoundError, ProcessLookupError):
+            continue
+        if int(fields[1]) == parent_pid:
+            children.append(int(entry))
+    return sorted(children)
+
+
+def worker_memory_report(master_pid: int) -> Dict[str, object]:
+    """
+    Report memory of a pre-forking server master and each of its workers.
+
+    Use `total_pss_mb` to size worker counts: it is the memory actually
+    consumed by the pool, with shared model weights counted once.
+    """
+    master = process_memory(master_pid)
+    workers = {pid: process_memory(pid) for pid in child_pids(master_pid)}
+    total_pss = master.get("pss_mb", 0) + sum(w.get("pss_mb", 0) for w in workers.values())
+    return {
+        "master": master,
+        "workers": workers,
+        "total_pss_mb": round(total_pss, 1),
+    }
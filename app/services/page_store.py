@@ -0,0 +1,182 @@
+"""
+Compressed local store for page text.
+
+Chunks overlap, so storing every chunk's text in Chroma duplicates much of
+each page. Instead each page is stored once here, and chunks keep only
+(page_id, start, end) offsets in their metadata. Text is rehydrated for the
+final top-k results only, which also makes it cheap to widen the context
+around a hit.
+
+On disk a store is two files:
+
+    pages.bin   zlib-compressed page texts, appended back to back (memory-mapped)
+    pages.json  {page_id: [offset, length]} index into pages.bin
+
+Writers serialize on an exclusive lock of pages.lock, so concurrent ingests
+can share one store.
+"""
+
+import fcntl
+import json
+import mmap
+import os
+import zlib
+from functools import lru_cache
+
+DATA_FILE = "pages.bin"
+INDEX_FILE = "pages.json"
+LOCK_FILE = "pages.lock"
+
+
+def page_id(doc_hash: str, page: int) -> str:
+    """Stable id of a page within a document."""
+    return f"{doc_hash}_p{page:04d}"
+
+
+class PageStore:
+    def __init__(self, root: str = "data/pages", cache_size: int = 256):
+        self.root = root
+        self.data_path = os.path.join(root, DATA_FILE)
+        self.index_path = os.path.join(root, INDEX_FILE)
+        self.lock_path = os.path.join(root, LOCK_FILE)
+        self._index: dict[str, list[int]] | None = None
+        self._mmap: mmap.mmap | None = None
+        self._read_page = lru_cache(maxsize=cache_size)(self._read_page_uncached)
+
+    @property
+    def index(self) -> dict[str, list[int]]:
+        if self._index is None:
+            self._load_index()
+        return self._index
+
+    def _load_index(self) -> None:
+        try:
+            with open(self.index_path) as f:
+                self._index = json.load(f)
+        except FileNotFoundError:
+            self._index = {}
+
+    def __contains__(self, pid: str) -> bool:
+        return pid in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def put_pages(self, pages: dict[str, str]) -> int:
+        """
+        Append pages that are not stored yet.
+
+        Args:
+            pages: Mapping of page id to page text
+
+        Returns:
+            int: Number of pages written
+        """
+        return self._append_blobs(
+            {pid: zlib.compress(text.encode("utf-8"), 6) for pid, text in pages.items() if pid not in self}
+        )
+
+    def _append_blobs(self, blobs: dict[str, bytes]) -> int:
+        if not blobs:
+            return 0
+        os.makedirs(self.root, exist_ok=True)
+        with open(self.lock_path, "w") as lock:
+            # Held across load/append/rewrite so another writer can neither
+            # interleave bytes in pages.bin nor overwrite our index entries
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self._load_index()  # pick up pages written by other processes
+            index = self._index
+
+            written = 0
+            with open(self.data_path, "ab") as f:
+                offset = f.tell()
+                for pid, blob in blobs.items():
+                    if pid in index:
+                        continue
+                    f.write(blob)
+                    index[pid] = [offset, len(blob)]
+                    offset += len(blob)
+                    written += 1
+
+            tmp_path = self.index_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(index, f)
+            os.replace(tmp_path, self.index_path)
+        return written
+
+    def merge(self, other: "PageStore") -> int:
+        """Copy pages missing here from another store, without recompressing."""
+        missing = [pid for pid in other.index if pid not in self]
+        return self._append_blobs({pid: other._raw(pid) for pid in missing})
+
+    def _raw(self, pid: str) -> bytes:
+        offset, length = self.index[pid]
+        if self._mmap is None or offset + length > len(self._mmap):
+            # First read, or the data file grew since it was mapped
+            with open(self.data_path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap[offset:offset + length]
+
+    def _read_page_uncached(self, pid: str) -> str:
+        if pid not in self.index:
+            self._load_index()
+        return zlib.decompress(self._raw(pid)).decode("utf-8")
+
+    def get(self, pid: str) -> str:
+        """Return the full text of a page."""
+        return self._read_page(pid)
+
+    def slice(self, pid: str, start: int, end: int, window: int = 0) -> str:
+        """
+        Return page text between character offsets.
+
+        `window` widens the span by up to that many characters on each side,
+        trimmed to whole words.
+        """
+        text = self.get(pid)
+        if window:
+            lo = max(0, start - window)
+            hi = min(len(text), end + window)
+            if lo > 0:
+                space = text.find(" ", lo, start)
+                lo = space + 1 if space != -1 else start
+            if hi < len(text):
+                space = text.rfind(" ", end, hi)
+                hi = space if space != -1 else end
+            start, end = lo, hi
+        return text[start:end]
+
+    def rehydrate(self, results: dict, window: int = 0) -> dict:
+        """
+        Fill in chunk texts of Chroma query results from stored pages.
+
+        Chunks that still carry their own document text are left unchanged
+        unless a `window` is requested, and also when their page is not in
+        this store.
+
+        Raises:
+            LookupError: If a chunk has no stored text and its page is missing,
+                e.g. on a node whose page store was not imported from a snapshot
+        """
+        documents = results.get("documents")
+        if not documents:
+            return results
+        for docs, metas in zip(documents, results.get("metadatas") or []):
+            for i, meta in enumerate(metas):
+                if not meta or "page_id" not in meta or (docs[i] is not None and not window):
+                    continue
+                pid = meta["page_id"]
+                if not self._has_page(pid):
+                    if docs[i] is None:
+                        raise LookupError(
+                            f"Page {pid} is missing from the page store at {self.root}; "
+                            "import a snapshot or re-ingest the document"
+                        )
+                    continue
+                docs[i] = self.slice(pid, meta["start"], meta["end"], window)
+        return results
+
+    def _has_page(self, pid: str) -> bool:
+        if pid not in self.index:
+            self._load_index()  # may have been written by another process
+        return pid in self.index
@@ -1,24 +1,48 @@
 from app.services.embedder import Embedder
 from app.services.chroma_store import ChromaStore
 from app.services.llm_client import LLMClient
+from app.services.hierarchy import coarse_to_fine_query
 import numpy as np
 
 
 class RAGPipeline:
-    def __init__(self):
-        self.embedder = Embedder("multi-qa-MiniLM-L6-cos-v1")
+    def __init__(self, embedder: Embedder | None = None):
+        # Pass a preloaded embedder to share model weights between pipelines/processes
+        self.embedder = embedder or Embedder("multi-qa-MiniLM-L6-cos-v1")
         self.store = ChromaStore()
         self.llm = LLMClient()
         self.last_contexts: list[str] = []
         self.last_metadatas: list[dict] = []
 
-    def query(self, question: str, k: int = 5) -> str:
+    def query(
+        self,
+        question: str,
+        k: int = 5,
+        where: dict | None = None,
+        coarse_k: int | None = None,
+        coarse_level: str = "page",
+        context_window: int = 0,
+    ) -> str:
         # 1. Embed the question
         q_vec = self.embedder.embed([question])[0]
 
-        # 2. Retrieve top-k relevant chunks
+        # 2. Retrieve top-k relevant chunks (filtered inside Chroma when `where` is set)
+        #    With `coarse_k`, search chunks only within the top candidate pages/documents
         q_vec = q_vec / np.linalg.norm(q_vec)
-        results = self.store.query(embedding=q_vec, k=k)
+        if coarse_k:
+            results = coarse_to_fine_query(
+                self.store,
+                q_vec,
+                k=k,
+                coarse_k=coarse_k,
+                level=coarse_level,
+                where=where,
+                context_window=context_window,
+            )
+        else:
+            results = self.store.query(
+                embedding=q_vec, k=k, where=where, context_window=context_window
+            )
         contexts = results["documents"][0]
         metadatas = results["metadatas"][0]
         self.last_contexts = contexts
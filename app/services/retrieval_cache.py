@@ -0,0 +1,105 @@
+"""
+Retrieval result cache.
+
+Entries are keyed by a hash of the normalized, quantized query vector plus
+the query parameters (k, filters, ...), and tagged with the index generation
+they were computed at. `ChromaStore` bumps its generation on every add or
+delete, so results from an older index are never served. The cache is
+bounded by entry count and approximate size in bytes, evicting the least
+recently used entries first.
+"""
+
+import copy
+import hashlib
+import json
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+class RetrievalCache:
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        decimals: int = 4,
+        ttl: float | None = 300.0,
+    ):
+        """
+        Args:
+            max_entries (int): Maximum number of cached results
+            max_bytes (int): Approximate memory bound for cached results
+            decimals (int): Query vector components are rounded to this many
+                decimals, so near-identical embeddings share an entry
+            ttl (float | None): Seconds an entry stays valid. Bounds staleness
+                when another process writes to the same collection, which
+                the local generation counter cannot see. None disables expiry.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.decimals = decimals
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[int, float, int, object]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, embedding, **params) -> str:
+        """Hash the normalized, quantized query vector together with the query parameters."""
+        vec = np.asarray(embedding, dtype=np.float32)
+        vec = vec / (np.linalg.norm(vec) or 1.0)
+        # + 0.0 turns -0.0 into 0.0 so both hash alike
+        quantized = np.round(vec, self.decimals) + 0.0
+        digest = hashlib.blake2b(quantized.tobytes(), digest_size=16)
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str, generation: int):
+        """Return a copy of the cached result, or None on a miss or stale entry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry_generation, created, _, value = entry
+                expired = self.ttl is not None and time.monotonic() - created > self.ttl
+                if entry_generation == generation and not expired:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return copy.deepcopy(value)
+                self._remove(key)
+            self.misses += 1
+            return None
+
+    def put(self, key: str, generation: int, value) -> None:
+        """Store a copy of a result computed at the given index generation."""
+        size = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (generation, time.monotonic(), size, copy.deepcopy(value))
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str) -> None:
+        _, _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,213 @@
+"""
+Portable index snapshots.
+
+A snapshot is a directory holding everything needed to rebuild the Chroma
+collection without re-embedding:
+
+    manifest.json   format version, row count, vector dim and file checksums
+    embeddings.npy  float32 matrix (count x dim), row i belongs to record i
+    records.jsonl   one {"id", "document", "metadata"} object per line
+    pages/          page text store, when chunks are stored as page offsets
+
+New nodes bulk-load a snapshot with `import_snapshot` instead of re-running
+`process_pdf` on every document.
+"""
+
+import json
+import os
+from typing import Iterator
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from app.services.checksum import file_sha256
+from app.services.chroma_store import ChromaStore
+from app.services.hierarchy import SummaryBuilder
+from app.services.page_store import DATA_FILE, INDEX_FILE, PageStore
+
+SNAPSHOT_FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+EMBEDDINGS_FILE = "embeddings.npy"
+RECORDS_FILE = "records.jsonl"
+PAGES_DIR = "pages"
+
+
+def export_snapshot(store: ChromaStore, out_dir: str, batch_size: int = 5000) -> dict:
+    """
+    Write every record of the store's collection to a snapshot directory.
+
+    Args:
+        store (ChromaStore): Store to export
+        out_dir (str): Target directory (created if missing)
+        batch_size (int): Number of records fetched from Chroma per request
+
+    Returns:
+        dict: The written manifest
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    collection = store.collection
+    count = collection.count()
+
+    emb_path = os.path.join(out_dir, EMBEDDINGS_FILE)
+    rec_path = os.path.join(out_dir, RECORDS_FILE)
+    vectors = None
+    dim = 0
+    written = 0
+
+    with open(rec_path, "w", encoding="utf-8") as records:
+        for offset in range(0, count, batch_size):
+            batch = collection.get(
+                limit=batch_size,
+                offset=offset,
+                include=["documents", "metadatas", "embeddings"],
+            )
+            embs = np.asarray(batch["embeddings"], dtype=np.float32)
+            if len(embs) == 0:
+                break
+            if vectors is None:
+                dim = embs.shape[1]
+                vectors = open_memmap(emb_path, mode="w+", dtype=np.float32, shape=(count, dim))
+
+            vectors[written:written + len(embs)] = embs
+            for rid, doc, meta in zip(batch["ids"], batch["documents"], batch["metadatas"]):
+                records.write(json.dumps({"id": rid, "document": doc, "metadata": meta}) + "\n")
+            written += len(embs)
+
+    if vectors is None:
+        np.save(emb_path, np.zeros((0, 0), dtype=np.float32))
+    else:
+        vectors.flush()
+        del vectors
+
+    if written != count:
+        raise RuntimeError(f"Collection changed during export: expected {count} rows, read {written}")
+
+    files = {
+        EMBEDDINGS_FILE: file_sha256(emb_path),
+        RECORDS_FILE: file_sha256(rec_path),
+    }
+    if len(store.pages):
+        pages = PageStore(os.path.join(out_dir, PAGES_DIR))
+        pages.merge(store.pages)
+        for name in (DATA_FILE, INDEX_FILE):
+            files[f"{PAGES_DIR}/{name}"] = file_sha256(os.path.join(out_dir, PAGES_DIR, name))
+
+    manifest = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "collection": collection.name,
+        "count": count,
+        "dim": dim,
+        "dtype": "float32",
+        "files": files,
+    }
+    with open(os.path.join(out_dir, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def read_manifest(snapshot_dir: str, verify: bool = True) -> dict:
+    """
+    Load a snapshot manifest and optionally verify file checksums.
+
+    Raises:
+        ValueError: If the format version is unsupported or a checksum does not match
+    """
+    with open(os.path.join(snapshot_dir, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+
+    if manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot format: {manifest.get('format_version')}")
+
+    if verify:
+        for name, expected in manifest["files"].items():
+            actual = file_sha256(os.path.join(snapshot_dir, name))
+            if actual != expected:
+                raise ValueError(f"Checksum mismatch for {name}: snapshot is corrupted")
+    return manifest
+
+
+def _count_lines(path: str) -> int:
+    count = 0
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            count += block.count(b"\n")
+    return count
+
+
+def _iter_record_batches(path: str, batch_size: int) -> Iterator[list[dict]]:
+    batch = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            batch.append(json.loads(line))
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def import_snapshot(store: ChromaStore, snapshot_dir: str, batch_size: int = 5000, verify: bool = True) -> int:
+    """
+    Bulk-load a snapshot into the store without re-embedding.
+
+    Vectors are memory-mapped and added in batches capped by the client's
+    maximum batch size. Stored page texts are merged into the store's page
+    store, and page/document summaries are rebuilt from the loaded vectors.
+
+    The target collection must be empty: Chroma silently skips ids that
+    already exist, so importing over existing records would leave a mix of
+    old and snapshot data.
+
+    Returns:
+        int: Number of records loaded
+
+    Raises:
+        ValueError: If the target collection is not empty, or the snapshot is
+            corrupted or its files disagree with the manifest. Nothing is
+            written to the store in that case.
+    """
+    manifest = read_manifest(snapshot_dir, verify=verify)
+    existing = store.collection.count()
+    if existing:
+        raise ValueError(f"Target collection already holds {existing} records; import into an empty collection")
+    if manifest["count"] == 0:
+        return 0
+
+    # Check everything up front so a bad snapshot cannot leave a half-imported collection
+    vectors = np.load(os.path.join(snapshot_dir, EMBEDDINGS_FILE), mmap_mode="r")
+    expected_shape = (manifest["count"], manifest["dim"])
+    if vectors.shape != expected_shape:
+        raise ValueError(f"Snapshot vectors have shape {vectors.shape}, manifest lists {expected_shape}")
+    records = _count_lines(os.path.join(snapshot_dir, RECORDS_FILE))
+    if records != manifest["count"]:
+        raise ValueError(f"Snapshot has {records} records but manifest lists {manifest['count']}")
+
+    if f"{PAGES_DIR}/{INDEX_FILE}" in manifest["files"]:
+        store.pages.merge(PageStore(os.path.join(snapshot_dir, PAGES_DIR)))
+
+    max_batch = getattr(store.client, "get_max_batch_size", None)
+    if max_batch is not None:
+        batch_size = min(batch_size, max_batch())
+
+    summaries = SummaryBuilder()
+    loaded = 0
+    for batch in _iter_record_batches(os.path.join(snapshot_dir, RECORDS_FILE), batch_size):
+        metadatas = [r["metadata"] for r in batch]
+        embeddings = np.asarray(vectors[loaded:loaded + len(batch)])
+        store.add(
+            ids=[r["id"] for r in batch],
+            texts=[r["document"] for r in batch],
+            metadatas=metadatas,
+            embeddings=embeddings,
+        )
+        summaries.add(metadatas, embeddings)
+        loaded += len(batch)
+
+    ids, metadatas, embeddings = summaries.build()
+    for start in range(0, len(ids), batch_size):
+        store.add_summaries(
+            ids=ids[start:start + batch_size],
+            metadatas=metadatas[start:start + batch_size],
+            embeddings=embeddings[start:start + batch_size],
+        )
+    return loaded
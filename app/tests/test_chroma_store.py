@@ -0,0 +1,113 @@
+import unittest
+import os
+import sys
+from unittest.mock import patch, MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from app.services.chroma_store import ChromaStore, build_where
+
+EMPTY_RESULTS = {"ids": [[]], "documents": [[]], "metadatas": [[]], "distances": [[]]}
+
+
+class TestBuildWhere(unittest.TestCase):
+    def test_no_constraints(self):
+        """Test that no constraints produce no filter."""
+        self.assertIsNone(build_where())
+        self.assertIsNone(build_where(sources=[]))
+
+    def test_single_clause_not_wrapped(self):
+        """Test that a single constraint is returned without `$and`."""
+        where = build_where(sources=["a.pdf", "b.pdf"])
+        self.assertEqual(where, {"source": {"$in": ["a.pdf", "b.pdf"]}})
+
+    def test_combined_clauses(self):
+        """Test that multiple constraints are combined with `$and`."""
+        where = build_where(
+            sources=["a.pdf"], page_min=2, page_max=4, ingested_after=100
+        )
+        self.assertEqual(
+            where,
+            {
+                "$and": [
+                    {"source": {"$in": ["a.pdf"]}},
+                    {"page": {"$gte": 2}},
+                    {"page": {"$lte": 4}},
+                    {"ingested_at": {"$gte": 100}},
+                ]
+            },
+        )
+
+
+class TestChromaStoreQuery(unittest.TestCase):
+    def setUp(self):
+        """Start each test with an empty process-wide result cache."""
+        ChromaStore._shared_cache = None
+
+    @patch("app.services.chroma_store.chromadb.HttpClient")
+    def test_where_passed_to_collection(self, mock_client):
+        """Test that the filter is pushed down into the Chroma query."""
+        collection = MagicMock()
+        collection.query.return_value = EMPTY_RESULTS
+        mock_client.return_value.get_or_create_collection.return_value = collection
+
+        store = ChromaStore()
+        where = {"page": {"$gte": 2}}
+        store.query(embedding=[0.1, 0.2], k=3, where=where)
+
+        collection.query.assert_called_once_with(
+            query_embeddings=[[0.1, 0.2]], n_results=3, where=where
+        )
+
+    @patch("app.services.chroma_store.chromadb.HttpClient")
+    def test_cache_invalidated_by_add(self, mock_client):
+        """Test that repeated queries hit the cache until the index changes."""
+        collection = MagicMock()
+        collection.query.return_value = EMPTY_RESULTS
+        mock_client.return_value.get_or_create_collection.return_value = collection
+
+        store = ChromaStore()
+        store.query(embedding=[0.6, 0.8], k=3)
+        store.query(embedding=[0.6, 0.8], k=3)
+        self.assertEqual(collection.query.call_count, 1)
+
+        store.query(embedding=[0.6, 0.8], k=4)
+        self.assertEqual(collection.query.call_count, 2)
+
+        store.add(ids=["x"], texts=["x"], metadatas=[{"page": 1}], embeddings=[[1.0, 0.0]])
+        store.query(embedding=[0.6, 0.8], k=3)
+        self.assertEqual(collection.query.call_count, 3)
+
+    @patch("app.services.chroma_store.chromadb.HttpClient")
+    def test_cache_shared_across_instances(self, mock_client):
+        """Test that a write through one store invalidates results cached by another."""
+        collection = MagicMock()
+        collection.query.return_value = EMPTY_RESULTS
+        mock_client.return_value.get_or_create_collection.return_value = collection
+
+        reader, writer = ChromaStore(), ChromaStore()
+        reader.query(embedding=[0.6, 0.8], k=3)
+        writer.query(embedding=[0.6, 0.8], k=3)
+        self.assertEqual(collection.query.call_count, 1)
+
+        writer.delete(ids=["x"])
+        reader.query(embedding=[0.6, 0.8], k=3)
+        self.assertEqual(collection.query.call_count, 2)
+
+    @patch("app.services.chroma_store.chromadb.HttpClient")
+    def test_use_cache_false(self, mock_client):
+        """Test that an uncached store always queries Chroma, even when the shared cache is warm."""
+        collection = MagicMock()
+        collection.query.return_value = EMPTY_RESULTS
+        mock_client.return_value.get_or_create_collection.return_value = collection
+
+        ChromaStore().query(embedding=[0.6, 0.8], k=3)
+        store = ChromaStore(use_cache=False)
+        self.assertIsNone(store.cache)
+        store.query(embedding=[0.6, 0.8], k=3)
+        store.query(embedding=[0.6, 0.8], k=3)
+        self.assertEqual(collection.query.call_count, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -150,5 +150,15 @@ class TestChunker(unittest.TestCase):
                 first_chunk.endswith("word2") or first_chunk.endswith("word1")
             )
 
+    def test_chunk_offsets(self):
+        """Test that chunk offsets locate the chunk text within its page."""
+        pages = [self.sample_pages[1]]
+        chunks = chunk_text(pages, max_tokens=12, overlap=3)
+
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            span = pages[0].text[chunk.start:chunk.end]
+            self.assertEqual(" ".join(span.split()), chunk.text)
+
 if __name__ == "__main__":
     unittest.main()
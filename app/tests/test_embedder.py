@@ -0,0 +1,79 @@
+import unittest
+import os
+import sys
+from multiprocessing import dummy
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from app.services.embedder import EmbeddingPool, length_sorted_batches
+
+
+class StubModel:
+    """Deterministic stand-in for SentenceTransformer: one vector per text."""
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+
+    def get_embedding_dimension(self):
+        return 3
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, show_progress_bar=False):
+        return np.array(
+            [[len(t), sum(map(ord, t)) % 97, t.count(" ")] for t in texts], dtype=np.float32
+        )
+
+
+def in_process_context(method):
+    # Thread pool in this process, so workers see the patched SentenceTransformer
+    return SimpleNamespace(Pool=dummy.Pool)
+
+
+class TestLengthSortedBatches(unittest.TestCase):
+    def test_every_index_once(self):
+        """Test that batching covers each input index exactly once."""
+        texts = ["a" * n for n in (5, 1, 9, 3, 7, 2, 8)]
+        batches = length_sorted_batches(texts, batch_size=3)
+
+        self.assertEqual([len(b) for b in batches], [3, 3, 1])
+        self.assertEqual(sorted(i for b in batches for i in b), list(range(len(texts))))
+
+    def test_batches_group_similar_lengths(self):
+        """Test that the longest texts are batched together."""
+        texts = ["short", "a much longer piece of text", "tiny", "another fairly long text"]
+        batches = length_sorted_batches(texts, batch_size=2)
+
+        self.assertEqual(set(batches[0]), {1, 3})
+        self.assertEqual(set(batches[1]), {0, 2})
+
+    def test_empty(self):
+        """Test that no texts produce no batches."""
+        self.assertEqual(length_sorted_batches([], batch_size=4), [])
+
+
+@patch("app.services.embedder.mp.get_context", in_process_context)
+@patch("app.services.embedder.SentenceTransformer", StubModel)
+class TestEmbeddingPool(unittest.TestCase):
+    def test_embed_matches_single_process_order(self):
+        """Test that pooled embedding returns rows in input order, as a single model would."""
+        texts = ["a" * n + " word" * (n % 4) for n in (40, 1, 17, 3, 90, 8, 25, 2, 61, 5, 12)]
+        expected = np.vstack([StubModel("stub").encode([t]) for t in texts])
+
+        with EmbeddingPool("stub", processes=3, batch_size=2) as pool:
+            vectors = pool.embed(texts)
+
+        self.assertEqual(pool.dim, 3)
+        np.testing.assert_array_equal(vectors, expected)
+
+    def test_model_load_failure_raises(self):
+        """Test that a model that cannot be loaded fails instead of hanging."""
+        with patch("app.services.embedder.SentenceTransformer", side_effect=OSError("offline")):
+            with self.assertRaises(OSError):
+                EmbeddingPool("missing-model", processes=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import unittest
+import os
+import sys
+from unittest.mock import patch
+
+import chromadb
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from app.services.chroma_store import ChromaStore
+from app.services.hierarchy import (
+    SummaryBuilder,
+    candidate_scope,
+    coarse_to_fine_query,
+    merge_results,
+)
+
+
+def unit(*values):
+    vec = np.array(values, dtype=np.float32)
+    return vec / np.linalg.norm(vec)
+
+
+class TestSummaryBuilder(unittest.TestCase):
+    def test_page_and_document_centroids(self):
+        """Test that centroids are built per page and per document."""
+        metas = [
+            {"source": "a.pdf", "page": 1, "doc_hash": "a"},
+            {"source": "a.pdf", "page": 1, "doc_hash": "a"},
+            {"source": "a.pdf", "page": 2, "doc_hash": "a"},
+            {"source": "old.pdf", "page": 1},  # no doc_hash: skipped
+        ]
+        vectors = [unit(1, 0), unit(0, 1), unit(1, 0), unit(1, 1)]
+        builder = SummaryBuilder()
+        builder.add(metas, vectors)
+        ids, summary_metas, centroids = builder.build()
+
+        by_id = dict(zip(ids, zip(summary_metas, centroids)))
+        self.assertEqual(set(by_id), {"a_p0001", "a_p0002", "a_doc"})
+        self.assertEqual(by_id["a_p0001"][0]["level"], "page")
+        self.assertEqual(by_id["a_doc"][0]["level"], "document")
+        self.assertNotIn("page", by_id["a_doc"][0])
+        np.testing.assert_allclose(by_id["a_p0001"][1], unit(1, 1), rtol=1e-6)
+        np.testing.assert_allclose(np.linalg.norm(centroids, axis=1), 1.0, rtol=1e-6)
+
+    def test_candidate_scope(self):
+        """Test that candidate pages are grouped per document."""
+        single = candidate_scope([{"doc_hash": "a", "page": 3}])
+        self.assertEqual(single, {"$and": [{"doc_hash": "a"}, {"page": {"$in": [3]}}]})
+
+        multi = candidate_scope(
+            [{"doc_hash": "a", "page": 3}, {"doc_hash": "b", "page": 1}, {"doc_hash": "a", "page": 5}]
+        )
+        self.assertEqual(len(multi["$or"]), 2)
+
+        docs = candidate_scope([{"doc_hash": "b"}, {"doc_hash": "a"}], level="document")
+        self.assertEqual(docs, {"doc_hash": {"$in": ["a", "b"]}})
+
+    def test_merge_results(self):
+        """Test that merged results keep the k nearest rows across both inputs."""
+        first = {"ids": [["a", "b"]], "documents": [["A", "B"]], "metadatas": [[{}, {}]], "distances": [[0.1, 0.5]]}
+        second = {"ids": [["c"]], "documents": [["C"]], "metadatas": [[{}]], "distances": [[0.3]]}
+        merged = merge_results(first, second, k=2)
+
+        self.assertEqual(merged["ids"], [["a", "c"]])
+        self.assertEqual(merged["documents"], [["A", "C"]])
+        self.assertEqual(merged["distances"], [[0.1, 0.3]])
+
+
+class TestCoarseToFineQuery(unittest.TestCase):
+    def setUp(self):
+        """Set up a store with two documents pointing in different directions."""
+        self.client = chromadb.EphemeralClient()
+        with patch("app.services.chroma_store.chromadb.HttpClient", return_value=self.client):
+            self.store = ChromaStore()
+
+        metas, vectors, ids = [], [], []
+        for doc, direction in (("a", (1, 0, 0)), ("b", (0, 1, 0))):
+            for page in (1, 2):
+                for n in range(3):
+                    noise = np.array([0, 0, 0.1 * (page + n)])
+                    ids.append(f"{doc}_{page}_{n}")
+                    metas.append({"source": f"{doc}.pdf", "page": page, "doc_hash": doc})
+                    vectors.append(unit(*(np.array(direction) + noise)))
+
+        self.store.add(ids=ids, texts=ids, metadatas=metas, embeddings=vectors)
+        builder = SummaryBuilder()
+        builder.add(metas, vectors)
+        self.store.add_summaries(*builder.build())
+
+    def tearDown(self):
+        self.client.delete_collection("pdf_chunks")
+        self.client.delete_collection("pdf_summaries")
+
+    def test_restricts_to_candidates(self):
+        """Test that the fine stage only returns chunks from candidate pages."""
+        results = coarse_to_fine_query(self.store, unit(0, 1, 0.1), k=6, coarse_k=1)
+        pages = {(m["doc_hash"], m["page"]) for m in results["metadatas"][0]}
+        self.assertEqual(len(pages), 1)
+        self.assertEqual(next(iter(pages))[0], "b")
+
+    def test_document_level(self):
+        """Test that document-level candidates scope the search to whole documents."""
+        results = coarse_to_fine_query(self.store, unit(1, 0, 0), k=6, coarse_k=1, level="document")
+        self.assertEqual({m["doc_hash"] for m in results["metadatas"][0]}, {"a"})
+
+    def test_where_applies_to_both_stages(self):
+        """Test that a user filter is honoured by the two-stage search."""
+        where = {"page": {"$gte": 2}}
+        results = coarse_to_fine_query(self.store, unit(1, 0, 0), k=3, coarse_k=2, where=where)
+        self.assertTrue(all(m["page"] == 2 for m in results["metadatas"][0]))
+
+    def test_falls_back_to_flat_search(self):
+        """Test that a store without matching summaries uses flat search."""
+        self.client.delete_collection("pdf_summaries")
+        self.store.summaries = self.client.get_or_create_collection("pdf_summaries")
+        results = coarse_to_fine_query(self.store, unit(1, 0, 0), k=4, coarse_k=2)
+        self.assertEqual(len(results["ids"][0]), 4)
+
+    def test_unsummarized_chunks_still_searched(self):
+        """Test that chunks without summaries are not dropped by two-stage search."""
+        self.store.add(
+            ids=["legacy_1", "legacy_2"],
+            texts=["legacy_1", "legacy_2"],
+            metadatas=[{"source": "legacy.pdf", "page": 1}, {"source": "legacy.pdf", "page": 2}],
+            embeddings=[unit(0, 0, 1), unit(0, 0.1, 1)],
+        )
+        results = coarse_to_fine_query(self.store, unit(0, 0, 1), k=3, coarse_k=1)
+
+        self.assertEqual(results["ids"][0][:2], ["legacy_1", "legacy_2"])
+        self.assertEqual(len(results["ids"][0]), 3)
+
+    def test_no_extra_query_when_all_summarized(self):
+        """Test that fully summarized stores need no unsummarized-chunk filter."""
+        self.assertIsNone(self.store.unsummarized_filter())
+
+    def test_invalid_level(self):
+        """Test that an unknown summary level is rejected."""
+        with self.assertRaises(ValueError):
+            coarse_to_fine_query(self.store, unit(1, 0, 0), level="chapter")
+
+
+if __name__ == "__main__":
+    unittest.main()
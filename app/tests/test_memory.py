@@ -0,0 +1,69 @@
+import unittest
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from app.services.memory import child_pids, parse_smaps_rollup, process_memory, worker_memory_report
+
+
+class TestMemory(unittest.TestCase):
+    def test_parse_smaps_rollup(self):
+        """Test that smaps_rollup kB values are converted to MiB summaries."""
+        text = (
+            "55d0-7ffe ---p 00000000 00:00 0    [rollup]\n"
+            "Rss:              204800 kB\n"
+            "Pss:               71680 kB\n"
+            "Pss_Anon:          10240 kB\n"
+            "Shared_Clean:     174080 kB\n"
+            "Shared_Dirty:       2048 kB\n"
+            "Private_Clean:      8192 kB\n"
+            "Private_Dirty:     20480 kB\n"
+        )
+        mem = parse_smaps_rollup(text)
+
+        self.assertEqual(mem["rss_mb"], 200.0)
+        self.assertEqual(mem["pss_mb"], 70.0)
+        self.assertEqual(mem["shared_mb"], 172.0)
+        self.assertEqual(mem["uss_mb"], 28.0)
+
+    def test_missing_process(self):
+        """Test that an unknown pid yields an empty report."""
+        self.assertEqual(process_memory(pid=2**31), {})
+
+
+@unittest.skipUnless(os.path.exists("/proc/self/smaps_rollup"), "requires /proc smaps_rollup")
+class TestWorkerMemory(unittest.TestCase):
+    def setUp(self):
+        """Start two idle child processes standing in for server workers."""
+        self.children = [
+            subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"]) for _ in range(2)
+        ]
+
+    def tearDown(self):
+        for child in self.children:
+            child.kill()
+            child.wait()
+
+    def test_child_pids(self):
+        """Test that the direct children of a process are listed."""
+        pids = child_pids(os.getpid())
+        for child in self.children:
+            self.assertIn(child.pid, pids)
+        self.assertNotIn(os.getpid(), pids)
+
+    def test_worker_memory_report(self):
+        """Test that the report covers master and workers and sums their PSS."""
+        report = worker_memory_report(os.getpid())
+
+        self.assertGreater(report["master"]["pss_mb"], 0)
+        for child in self.children:
+            self.assertIn(child.pid, report["workers"])
+        expected = report["master"]["pss_mb"] + sum(w.get("pss_mb", 0) for w in report["workers"].values())
+        self.assertAlmostEqual(report["total_pss_mb"], expected, places=1)
+        self.assertGreater(report["total_pss_mb"], report["master"]["pss_mb"])
+
+
+if __name__ == "__main__":
+    unittest.main()
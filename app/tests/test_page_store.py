@@ -0,0 +1,100 @@
+import unittest
+import os
+import sys
+import tempfile
+from multiprocessing import get_context
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from app.services.page_store import PageStore, page_id
+
+
+def _write_pages(root: str, worker: int) -> None:
+    store = PageStore(root)
+    for n in range(20):
+        store.put_pages({f"w{worker}_p{n:04d}": f"worker {worker} page {n} " * 50})
+
+
+class TestPageStore(unittest.TestCase):
+    def setUp(self):
+        """Set up a store with two pages in a temporary directory."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = PageStore(os.path.join(self.tmp.name, "pages"))
+        self.text = "The quick brown fox jumps over the lazy dog."
+        self.store.put_pages({page_id("abc", 1): self.text, page_id("abc", 2): "Second page."})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        """Test that pages are read back unchanged, including from a new instance."""
+        self.assertEqual(self.store.get("abc_p0001"), self.text)
+        reopened = PageStore(self.store.root)
+        self.assertEqual(len(reopened), 2)
+        self.assertEqual(reopened.get("abc_p0002"), "Second page.")
+
+    def test_existing_pages_not_rewritten(self):
+        """Test that re-ingesting a page does not store it twice."""
+        size = os.path.getsize(self.store.data_path)
+        written = self.store.put_pages({"abc_p0001": self.text})
+
+        self.assertEqual(written, 0)
+        self.assertEqual(os.path.getsize(self.store.data_path), size)
+
+    def test_slice_and_window(self):
+        """Test that offsets slice the page and windows widen to whole words."""
+        start = self.text.index("fox")
+        end = start + len("fox jumps")
+
+        self.assertEqual(self.store.slice("abc_p0001", start, end), "fox jumps")
+        self.assertEqual(self.store.slice("abc_p0001", start, end, window=7), "brown fox jumps over")
+        self.assertEqual(self.store.slice("abc_p0001", start, end, window=1000), self.text)
+
+    def test_rehydrate(self):
+        """Test that missing chunk texts are filled from page offsets."""
+        results = {
+            "documents": [[None, "kept as stored"]],
+            "metadatas": [[
+                {"page_id": "abc_p0001", "start": 4, "end": 9},
+                {"page": 3},
+            ]],
+        }
+        self.store.rehydrate(results)
+        self.assertEqual(results["documents"][0], ["quick", "kept as stored"])
+
+    def test_rehydrate_missing_page(self):
+        """Test that stored texts are kept, and offset-only chunks fail clearly, when a page is missing."""
+        meta = {"page_id": "zzz_p0001", "start": 0, "end": 5}
+        results = {"documents": [["stored text"]], "metadatas": [[meta]]}
+        self.store.rehydrate(results, window=10)
+        self.assertEqual(results["documents"][0], ["stored text"])
+
+        with self.assertRaises(LookupError) as context:
+            self.store.rehydrate({"documents": [[None]], "metadatas": [[meta]]})
+        self.assertIn("zzz_p0001", str(context.exception))
+
+    def test_concurrent_writers(self):
+        """Test that pages appended by parallel processes are all kept and readable."""
+        root = os.path.join(self.tmp.name, "shared")
+        procs = [get_context("spawn").Process(target=_write_pages, args=(root, w)) for w in range(4)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+
+        store = PageStore(root)
+        self.assertEqual(len(store), 80)
+        for w in range(4):
+            self.assertEqual(store.get(f"w{w}_p0019"), f"worker {w} page 19 " * 50)
+
+    def test_merge(self):
+        """Test that merging copies only missing pages."""
+        other = PageStore(os.path.join(self.tmp.name, "other"))
+        other.put_pages({"abc_p0001": self.text, "def_p0001": "Other document."})
+
+        self.assertEqual(self.store.merge(other), 1)
+        self.assertEqual(self.store.get("def_p0001"), "Other document.")
+
+
+if __name__ == "__main__":
+    unittest.main()
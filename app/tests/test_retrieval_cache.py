@@ -0,0 +1,62 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from app.services.retrieval_cache import RetrievalCache
+
+
+class TestRetrievalCache(unittest.TestCase):
+    def test_key_quantizes_and_normalizes(self):
+        """Test that scaled or slightly perturbed vectors share a key, other params do not."""
+        cache = RetrievalCache(decimals=3)
+        key = cache.key([0.6, 0.8], k=5, where=None)
+
+        self.assertEqual(key, cache.key([1.2, 1.6], k=5, where=None))
+        self.assertEqual(key, cache.key([0.60001, 0.79999], k=5, where=None))
+        self.assertNotEqual(key, cache.key([0.6, 0.8], k=6, where=None))
+        self.assertNotEqual(key, cache.key([0.6, 0.8], k=5, where={"page": 1}))
+
+    def test_generation_mismatch_is_a_miss(self):
+        """Test that results from an older index generation are not served."""
+        cache = RetrievalCache()
+        cache.put("q", 1, {"ids": [["a"]]})
+
+        self.assertEqual(cache.get("q", 1), {"ids": [["a"]]})
+        self.assertIsNone(cache.get("q", 2))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_returns_copies(self):
+        """Test that mutating a returned result does not change the cache."""
+        cache = RetrievalCache()
+        cache.put("q", 0, {"documents": [["text"]]})
+        cache.get("q", 0)["documents"][0][0] = "changed"
+
+        self.assertEqual(cache.get("q", 0), {"documents": [["text"]]})
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = RetrievalCache(max_entries=2)
+        cache.put("a", 0, 1)
+        cache.put("b", 0, 2)
+        cache.get("a", 0)
+        cache.put("c", 0, 3)
+
+        self.assertIsNone(cache.get("b", 0))
+        self.assertEqual(cache.get("a", 0), 1)
+        self.assertEqual(cache.get("c", 0), 3)
+
+    def test_byte_bound(self):
+        """Test that the cache stays within its memory bound."""
+        cache = RetrievalCache(max_bytes=2000)
+        for i in range(10):
+            cache.put(str(i), 0, "x" * 500)
+
+        self.assertLessEqual(cache.stats()["bytes"], 2000)
+        self.assertIsNotNone(cache.get("9", 0))
+        self.assertIsNone(cache.get("0", 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
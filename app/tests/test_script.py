@@ -0,0 +1,103 @@
+import unittest
+import os
+import sys
+import tempfile
+from unittest.mock import patch
+
+import chromadb
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from app.script import process_pdf
+from app.services.checksum import file_sha256
+from app.services.chroma_store import ChromaStore
+from app.services.chunker import TextChunk
+from app.services.hierarchy import coarse_to_fine_query
+from app.services.pdf_reader import PageTextDC
+
+
+class TestProcessPdf(unittest.TestCase):
+    def setUp(self):
+        """Set up a PDF stand-in, an in-memory Chroma and a temporary page store."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.pdf_path = os.path.join(self.tmp.name, "doc.pdf")
+        with open(self.pdf_path, "wb") as f:
+            f.write(b"%PDF fake")
+        self.client = chromadb.EphemeralClient()
+        self.env = patch.dict(os.environ, {"PAGE_STORE_DIR": os.path.join(self.tmp.name, "pages")})
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        self.client.delete_collection("pdf_chunks")
+        self.client.delete_collection("pdf_summaries")
+        self.tmp.cleanup()
+
+    @patch("app.script.Embedder")
+    @patch("app.script.chunk_text")
+    @patch("app.script.extract_pdf_text")
+    def test_non_compact_query_with_context_window(self, mock_extract, mock_chunk, mock_embedder):
+        """Test that chunks stored with full text can be queried with a context window."""
+        page_text = "Attention is all you need. Transformers rely on attention."
+        mock_extract.return_value = [PageTextDC(page=1, text=page_text, source="doc.pdf")]
+        mock_chunk.return_value = [
+            TextChunk(id="doc.pdf_0001", page=1, text="Attention is all you need.", start=0, end=26)
+        ]
+        mock_embedder.return_value.embed.return_value = np.array([[1.0, 0.0, 0.0]], dtype=np.float32)
+
+        with patch("app.services.chroma_store.chromadb.HttpClient", return_value=self.client):
+            process_pdf(self.pdf_path, compact=False)
+            store = ChromaStore()
+
+        stored = store.collection.get(include=["metadatas"])["metadatas"][0]
+        self.assertNotIn("page_id", stored)
+        self.assertEqual(len(store.pages), 0)
+
+        results = store.query(embedding=[1.0, 0.0, 0.0], k=1, context_window=10)
+        self.assertEqual(results["documents"][0], ["Attention is all you need."])
+
+    @patch("app.script.time.time")
+    @patch("app.script.Embedder")
+    @patch("app.script.chunk_text")
+    @patch("app.script.extract_pdf_text")
+    def test_reingest_replaces_previous_revision(self, mock_extract, mock_chunk, mock_embedder, mock_time):
+        """Test that re-ingesting an edited PDF stores the new revision's chunks and metadata."""
+        mock_extract.return_value = [PageTextDC(page=1, text="Old text. More old text.", source="doc.pdf")]
+        mock_chunk.return_value = [
+            TextChunk(id="doc.pdf_0001", page=1, text="Old text.", start=0, end=9),
+            TextChunk(id="doc.pdf_0002", page=1, text="More old text.", start=10, end=24),
+        ]
+        mock_embedder.return_value.embed.return_value = np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]], dtype=np.float32)
+        mock_time.return_value = 1000
+
+        with patch("app.services.chroma_store.chromadb.HttpClient", return_value=self.client):
+            process_pdf(self.pdf_path)
+
+            with open(self.pdf_path, "wb") as f:
+                f.write(b"%PDF fake, edited")
+            mock_extract.return_value = [PageTextDC(page=1, text="New text.", source="doc.pdf")]
+            mock_chunk.return_value = [TextChunk(id="doc.pdf_0001", page=1, text="New text.", start=0, end=9)]
+            mock_embedder.return_value.embed.return_value = np.array([[0.0, 0.0, 1.0]], dtype=np.float32)
+            mock_time.return_value = 2000
+            process_pdf(self.pdf_path)
+            store = ChromaStore()
+
+        stored = store.collection.get(include=["metadatas"])
+        self.assertEqual(stored["ids"], ["doc.pdf_0001"])
+        self.assertEqual(stored["metadatas"][0]["doc_hash"], file_sha256(self.pdf_path))
+        self.assertEqual(stored["metadatas"][0]["ingested_at"], 2000)
+
+        results = store.query(embedding=[0.0, 0.0, 1.0], k=5, where={"ingested_at": {"$gte": 1500}})
+        self.assertEqual(results["documents"][0], ["New text."])
+
+        # Summaries of the old revision are gone, so coarse search cannot pick a
+        # page that no longer has chunks, even for a query close to the old text
+        summaries = store.summaries.get(include=["metadatas"])
+        self.assertEqual({m["doc_hash"] for m in summaries["metadatas"]}, {file_sha256(self.pdf_path)})
+        results = coarse_to_fine_query(store, [0.7071, 0.7071, 0.0], k=5, coarse_k=1)
+        self.assertEqual(results["documents"][0], ["New text."])
+
+
+if __name__ == "__main__":
+    unittest.main()
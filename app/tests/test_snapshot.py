@@ -0,0 +1,148 @@
+import unittest
+import os
+import sys
+import tempfile
+from unittest.mock import patch
+
+import chromadb
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from app.services.chroma_store import ChromaStore
+from app.services.snapshot import (
+    EMBEDDINGS_FILE,
+    RECORDS_FILE,
+    export_snapshot,
+    import_snapshot,
+    read_manifest,
+)
+
+
+def make_store(client):
+    with patch("app.services.chroma_store.chromadb.HttpClient", return_value=client):
+        return ChromaStore()
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        """Set up an in-memory source store with a few records."""
+        self.source_client = chromadb.EphemeralClient()
+        self.source = make_store(self.source_client)
+        rng = np.random.default_rng(0)
+        self.vectors = rng.random((7, 4), dtype=np.float32)
+        self.ids = [f"test.pdf_{i:04d}" for i in range(1, 8)]
+        self.source.add(
+            ids=self.ids,
+            texts=[f"chunk {i}" for i in range(7)],
+            metadatas=[{"source": "test.pdf", "page": i % 3 + 1} for i in range(7)],
+            embeddings=self.vectors,
+        )
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.source_client.delete_collection("pdf_chunks")
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        """Test that export followed by import restores ids, texts, metadata and vectors."""
+        manifest = export_snapshot(self.source, self.tmp.name, batch_size=3)
+        self.assertEqual(manifest["count"], 7)
+        self.assertEqual(manifest["dim"], 4)
+
+        self.source_client.delete_collection("pdf_chunks")
+        target = make_store(self.source_client)
+        loaded = import_snapshot(target, self.tmp.name, batch_size=2)
+
+        self.assertEqual(loaded, 7)
+        got = target.collection.get(
+            ids=self.ids, include=["documents", "metadatas", "embeddings"]
+        )
+        by_id = dict(zip(got["ids"], got["embeddings"]))
+        for i, rid in enumerate(self.ids):
+            np.testing.assert_allclose(by_id[rid], self.vectors[i], rtol=1e-6)
+        self.assertIn("chunk 0", got["documents"])
+
+    def test_page_store_round_trip(self):
+        """Test that chunks stored as page offsets are restored with their page text."""
+        page_text = "Attention is all you need."
+        source_pages = os.path.join(self.tmp.name, "source_pages")
+        with patch.dict(os.environ, {"PAGE_STORE_DIR": source_pages}):
+            source = make_store(self.source_client)
+        source.pages.put_pages({"h_p0001": page_text})
+        source.add(
+            ids=["compact_0001"],
+            texts=None,
+            metadatas=[{"source": "a.pdf", "page": 1, "page_id": "h_p0001", "start": 0, "end": 9}],
+            embeddings=[[1.0, 0.0, 0.0, 0.0]],
+        )
+        snapshot_dir = os.path.join(self.tmp.name, "snapshot")
+        manifest = export_snapshot(source, snapshot_dir)
+        self.assertIn("pages/pages.bin", manifest["files"])
+
+        self.source_client.delete_collection("pdf_chunks")
+        with patch.dict(os.environ, {"PAGE_STORE_DIR": os.path.join(self.tmp.name, "target_pages")}):
+            target = make_store(self.source_client)
+        import_snapshot(target, snapshot_dir)
+
+        results = target.query(embedding=[1.0, 0.0, 0.0, 0.0], k=1)
+        self.assertEqual(results["documents"][0], ["Attention"])
+
+    def test_checksum_mismatch(self):
+        """Test that a corrupted snapshot is rejected."""
+        export_snapshot(self.source, self.tmp.name)
+        with open(os.path.join(self.tmp.name, EMBEDDINGS_FILE), "r+b") as f:
+            f.seek(-1, os.SEEK_END)
+            last = f.read(1)
+            f.seek(-1, os.SEEK_END)
+            f.write(bytes([last[0] ^ 0xFF]))
+
+        with self.assertRaises(ValueError) as context:
+            read_manifest(self.tmp.name)
+        self.assertIn("Checksum mismatch", str(context.exception))
+
+    def test_truncated_records_rejected_before_import(self):
+        """Test that a snapshot whose files disagree with the manifest adds nothing."""
+        export_snapshot(self.source, self.tmp.name)
+        rec_path = os.path.join(self.tmp.name, RECORDS_FILE)
+        with open(rec_path) as f:
+            lines = f.readlines()
+        with open(rec_path, "w") as f:
+            f.writelines(lines[:-2])
+
+        self.source_client.delete_collection("pdf_chunks")
+        target = make_store(self.source_client)
+        with self.assertRaises(ValueError) as context:
+            import_snapshot(target, self.tmp.name, verify=False)
+
+        self.assertIn("5 records", str(context.exception))
+        self.assertEqual(target.collection.count(), 0)
+
+    def test_vector_shape_mismatch_rejected(self):
+        """Test that vectors not matching the manifest shape are rejected."""
+        export_snapshot(self.source, self.tmp.name)
+        np.save(os.path.join(self.tmp.name, EMBEDDINGS_FILE), self.vectors[:, :3])
+
+        self.source_client.delete_collection("pdf_chunks")
+        target = make_store(self.source_client)
+        with self.assertRaises(ValueError) as context:
+            import_snapshot(target, self.tmp.name, verify=False)
+
+        self.assertIn("shape", str(context.exception))
+        self.assertEqual(target.collection.count(), 0)
+
+    def test_non_empty_target_rejected(self):
+        """Test that importing into a collection that already holds records adds nothing."""
+        export_snapshot(self.source, self.tmp.name)
+        self.source.delete(ids=self.ids[3:])
+
+        with self.assertRaises(ValueError) as context:
+            import_snapshot(self.source, self.tmp.name)
+
+        self.assertIn("already holds 3 records", str(context.exception))
+        self.assertEqual(self.source.collection.count(), 3)
+        self.assertEqual(self.source.summaries.count(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()